@@ -2,7 +2,7 @@ try:
     from typing import Literal
 except ImportError:
     from typing_extensions import Literal  # type:ignore
-from typing import Optional, Union, Sequence
+from typing import List, Optional, Union
 from pydantic import Field, validator,AnyUrl
 from fhirkit.choice_type import deterimine_choice_type, ChoiceType
 from fhirkit.Resource import DomainResource, ResourceWithMultiIdentifier
@@ -25,7 +25,7 @@ class ConditionStage(BackboneElement):
     summary: Optional[CodeableConcept] = Field(
         None,
         title="Simple summary (disease specific)")
-    assessment: Optional[Sequence[Reference]] = Field(
+    assessment: Optional[List[Reference]] = Field(
         None,
         enum_reference_types=["ClinicalImpression","DiagnosticReport","Observation"],
         title="Formal record of assessment")
@@ -34,10 +34,10 @@ class ConditionStage(BackboneElement):
         title="Kind of staging")
 
 class ConditionEvidence(BackboneElement):
-    code: Optional[Sequence[CodeableConcept]] = Field(
+    code: Optional[List[CodeableConcept]] = Field(
         None,
         title="Manifestation/symptom")
-    detail: Optional[Sequence[Reference]] = Field(
+    detail: Optional[List[Reference]] = Field(
         None,
         enum_reference_types=["Any"],
         title="Supporting information found elsewhere")
@@ -47,7 +47,7 @@ class Condition(DomainResource, ResourceWithMultiIdentifier):
     resourceType: Literal["Condition"] = Field(
         "Condition", 
         const=True)
-    identifier: Sequence[Identifier] = Field(
+    identifier: List[Identifier] = Field(
         None,
         title="External Ids for this condition")
     clinicalStatus: Optional[CodeableConcept] = Field(
@@ -58,7 +58,7 @@ class Condition(DomainResource, ResourceWithMultiIdentifier):
         None,
         title="unconfirmed | provisional | differential | confirmed | refuted | entered-in-error",
         valueset="http://hl7.org/fhir/ValueSet/condition-ver-status")
-    category: Optional[Sequence[CodeableConcept]] = Field(
+    category: Optional[List[CodeableConcept]] = Field(
         None,
         title="problem-list-item | encounter-diagnosis",
         valueset="http://hl7.org/fhir/ValueSet/condition-category")
@@ -69,7 +69,7 @@ class Condition(DomainResource, ResourceWithMultiIdentifier):
     code: Optional[CodeableConcept] = Field(
         None,
         title="Identification of the condition, problem or diagnosis")
-    bodySite: Optional[Sequence[CodeableConcept]] = Field(
+    bodySite: Optional[List[CodeableConcept]] = Field(
         None,
         title="Anatomical location, if relevant")
     subject: Optional[Reference] = Field(
@@ -127,13 +127,13 @@ class Condition(DomainResource, ResourceWithMultiIdentifier):
         None,
         enum_reference_types=["Practitioner","PractitionerRole","Patient","RelatedPerson"],
         title="Person who asserts this condition")
-    stage: Optional[Sequence[ConditionStage]] = Field(
+    stage: Optional[List[ConditionStage]] = Field(
         None,
         title="Stage/grade, usually assessed formally")
-    evidence: Optional[Sequence[ConditionEvidence]] = Field(
+    evidence: Optional[List[ConditionEvidence]] = Field(
         None,
         title="Supporting evidence")
-    note: Optional[Sequence[Annotation]] = Field(
+    note: Optional[List[Annotation]] = Field(
         None,
         title="Additional information about the Condition")
 
@@ -4,10 +4,10 @@ try:
     from typing import Literal
 except ImportError:
     from typing_extensions import Literal # type: ignore
-from typing import Iterable, List, Optional, Sequence, Union
-from pydantic import Field, validator
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple, Union, cast
+from pydantic import Field, PrivateAttr, parse_obj_as, validator
 from fhirkit.BaseModel import BaseModel
-from fhirkit.primitive_datatypes import URI, dateTime
+from fhirkit.primitive_datatypes import URI, XHTML, dateTime
 from fhirkit.elements import (
     BackboneElement,
     CodeableConcept,
@@ -24,16 +24,21 @@ class VSDesignation(BaseModel):
     use: Optional[Coding]
     value: str
 
+    class Config:
+        copy_on_model_validation = "none"
+
 
 class VSConcept(BaseModel):
     code: str
     display: Optional[str]
-    designation: List[VSDesignation] = Field(default=[])
+    designation: List[VSDesignation] = Field(default_factory=list)
 
+    class Config:
+        copy_on_model_validation = "none"
 
-class VSFilter(BackboneElement):
-    property: str
-    op: Literal[
+
+_VSFILTER_OPS = frozenset(
+    {
         "=",
         "is-a",
         "descendent-of",
@@ -45,22 +50,34 @@ class VSFilter(BackboneElement):
         "child-of",
         "descendent-leaf",
         "exists",
-    ]
+    }
+)
+
+
+class VSFilter(BackboneElement):
+    property: str
+    op: str
     value: str
 
+    @validator("op", allow_reuse=True)
+    def check_op(cls, v):
+        if v not in _VSFILTER_OPS:
+            raise ValueError(f"'{v}' is not a valid ValueSet filter operator")
+        return v
+
 
 class VSInclude(BackboneElement):
     system: Optional[URI] = None
     version: Optional[str] = None
-    concept: Sequence[VSConcept] = Field(default=[])
-    filter: Sequence[VSFilter] = Field(default=[])
-    valueSet: Sequence[URI] = Field(default=[])
+    concept: List[VSConcept] = Field(default_factory=list)
+    filter: List[VSFilter] = Field(default_factory=list)
+    valueSet: List[URI] = Field(default_factory=list)
 
 
 class VSCompose(BaseModel):
-    include: Sequence[VSInclude] = []
-    exclude: Sequence[VSInclude] = []
-    property: Sequence[str] = []
+    include: List[VSInclude] = Field(default_factory=list)
+    exclude: List[VSInclude] = Field(default_factory=list)
+    property: Tuple[str, ...] = Field(default_factory=tuple)
     lockedDate: Optional[date]
     inactive: Optional[bool]
 
@@ -75,17 +92,25 @@ class VSCodingProperty(BackboneElement):
     valueDecimal: Optional[float]
 
 class VSCodingWithDesignation(AbstractCoding):
-    designation: Sequence[VSDesignation] = Field(default_factory=list)
+    designation: List[VSDesignation] = Field(default_factory=list)
     abstract: Optional[bool] = None
     inactive: Optional[bool] = None
-    property: Sequence[VSCodingProperty] = Field(default_factory=list)
+    property: List[VSCodingProperty] = Field(default_factory=list)
+
+    class Config:
+        copy_on_model_validation = "none"
 
 class VSExpansion(BackboneElement):
     offset: Optional[int] = None
     total: Optional[int] = None
-    contains: Sequence[VSCodingWithDesignation] = Field(default_factory=list)
+    contains: List[VSCodingWithDesignation] = Field(default_factory=list)
     identifier: Optional[URI] = None
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: Optional[datetime] = None
+
+    @property
+    def timestamp_or_now(self) -> datetime:
+        """The expansion timestamp, or the current time when none was set."""
+        return self.timestamp or datetime.now()
 
 
 class ValueSet(CanonicalResource):
@@ -94,7 +119,7 @@ class ValueSet(CanonicalResource):
     name: Optional[str]
     compose: Optional[VSCompose]
     expansion: Optional[VSExpansion]
-    useContext: Sequence[UsageContext] = Field(default_factory=list, repr=True)
+    useContext: List[UsageContext] = Field(default_factory=list, repr=True)
 
     @property
     def has_expanded(self):
@@ -119,25 +144,61 @@ class ValueSet(CanonicalResource):
         raise NotImplementedError()
 
     def validate_code(self, code: Union[Coding, CodeableConcept]):
-        raise NotImplementedError()
+        if isinstance(code, CodeableConcept):
+            return any(self.validate_code(c) for c in code.coding)
+        elif isinstance(code, Coding):
+            key = code._key()
+            return any(c._key() == key for c in self)
+        else:
+            return False
+
+    def __contains__(self, item: Any) -> bool:
+        handler = _CONTAINS_DISPATCH.get(type(item))
+        if handler is not None:
+            return handler(self, item)
+        # slow path for subclasses such as SCTCoding or SCTConcept
+        return isinstance(item, (Coding, CodeableConcept)) and self.validate_code(item)
+
+    def __iter__(self):
+        if self.expansion is None:
+            self.expand()
+        return iter(self.expansion.contains)  # type: ignore[union-attr]
+
+    def __len__(self):
+        if self.expansion is None:
+            self.expand()
+        return len(self.expansion.contains)  # type: ignore[union-attr]
+
+    def __bool__(self):
+        # truthiness should not depend on (or trigger) an expansion through __len__
+        return True
 
     def init_expansion(self):
         self.expansion = VSExpansion()
 
 
-class SimpleValueSet(ValueSet):
-    status: Literal["active"] = Field("active", const=True)
-    expansion: VSExpansion
+def _contains_code(vs: ValueSet, item: Union[Coding, CodeableConcept]) -> bool:
+    return vs.validate_code(item)
 
-    def __init__(self, *args: VSCodingWithDesignation, **kwargs):
-        if len(args) > 0:
 
-            assert "expansion" not in kwargs, "When passing an iterable with concepts, `expansion` should be None."
-            super().__init__(
-                expansion=VSExpansion.parse_obj({"contains":[c.dict() for c in args], "total":len(args)}),
-                text=Narrative(
-                    status="generated",
-                    div="""
+_CONTAINS_DISPATCH: Dict[type, Callable[[ValueSet, Any], bool]] = {
+    Coding: _contains_code,
+    CodeableConcept: _contains_code,
+}
+
+
+VSCodingInput = Union[VSCodingWithDesignation, AbstractCoding, Dict[str, Any]]
+
+
+def _parse_codings(codes: Iterable[VSCodingInput]) -> List[VSCodingWithDesignation]:
+    """Validate a batch of codings in one pass, reusing the ones that are already VSCodingWithDesignation."""
+    codes = list(codes)
+    if all(isinstance(c, VSCodingWithDesignation) for c in codes):
+        return cast(List[VSCodingWithDesignation], codes)
+    return parse_obj_as(List[VSCodingWithDesignation], codes)
+
+
+_VS_NARRATIVE_HEADER = """
                 <div>
                     <style scoped>
                         .dataframe tbody tr th:only-of-type {
@@ -162,16 +223,37 @@ class SimpleValueSet(ValueSet):
                             </tr>
                         </thead>
                         <tbody>"""
-                    + "".join(
-                        [
-                            f"<tr><th>{c.code}</th><td>{c.display}</td><td>{c.system}</td><td>{c.version}</td></tr>"
-                            for c in args
-                        ]
-                    )
-                    + """
+
+_VS_NARRATIVE_FOOTER = """
                         </tbody>
                     </table>
-                </div>""",
+                </div>"""
+
+
+class SimpleValueSet(ValueSet):
+    status: Literal["active"] = Field("active", const=True)
+    expansion: VSExpansion
+    _code_index: Optional[FrozenSet[Tuple[Optional[str], str]]] = PrivateAttr(None)
+    _code_index_source: Optional[Tuple[List[VSCodingWithDesignation], int]] = PrivateAttr(None)
+    _system: Optional[str] = PrivateAttr(None)
+
+    def __init__(self, *args: VSCodingInput, **kwargs):
+        if len(args) > 0:
+
+            assert "expansion" not in kwargs, "When passing an iterable with concepts, `expansion` should be None."
+            contains = _parse_codings(args)
+            super().__init__(
+                expansion=VSExpansion.construct(contains=contains, total=len(contains)),
+                text=Narrative.construct(
+                    status="generated",
+                    div=XHTML(
+                        _VS_NARRATIVE_HEADER
+                        + "".join(
+                            f"<tr><th>{c.code}</th><td>{c.display}</td><td>{c.system}</td><td>{c.version}</td></tr>"
+                            for c in contains
+                        )
+                        + _VS_NARRATIVE_FOOTER
+                    ),
                 ),
                 **kwargs,
             )
@@ -180,24 +262,50 @@ class SimpleValueSet(ValueSet):
 
     def append(
         self,
-        code: VSCodingWithDesignation,
+        code: VSCodingInput,
     ):
 
         assert self.expansion is not None, "`self.expansion` is None after initialisation with `self.init_expansion`"
-        self.expansion.contains.append(code)
+        self.expansion.contains.extend(_parse_codings([code]))
 
     def extend(
         self,
-        codes: Iterable[VSCodingWithDesignation],
+        codes: Iterable[VSCodingInput],
     ):
         assert self.expansion is not None, "`self.expansion` is None after initialisation with `self.init_expansion`"
-        self.expansion.contains.extend(codes)
+        self.expansion.contains.extend(_parse_codings(codes))
+
+    def invalidate_index(self):
+        """Drop the cached code index so the next lookup rebuilds it.
+
+        `append`, `extend` and replacing `expansion` are picked up automatically. Call this after editing
+        `expansion.contains` in place without changing its length, e.g. `vs.expansion.contains[0] = coding`.
+        """
+        self._code_index = None
+
+    @property
+    def code_index(self) -> FrozenSet[Tuple[Optional[str], str]]:
+        """Set of (system, code) pairs in the expansion, built on first use. See `invalidate_index`."""
+        contains = self.expansion.contains
+        source = self._code_index_source
+        # rebuild when the expansion (or its list of codings) was replaced or resized since the last build
+        if self._code_index is None or source is None or source[0] is not contains or source[1] != len(contains):
+            self._code_index = frozenset(c._key() for c in contains)
+            self._code_index_source = (contains, len(contains))
+            # most ValueSets draw from a single code system; remembering it lets validate_code reject other
+            # systems without building and hashing a key tuple (the frozenset lookup is O(1) either way)
+            systems = {system for system, _ in self._code_index}
+            self._system = systems.pop() if len(systems) == 1 else None
+        return self._code_index
 
     def validate_code(self, code: Union[Coding, CodeableConcept]):
         if isinstance(code, CodeableConcept):
             return any(self.validate_code(c) for c in code.coding)
         elif isinstance(code, Coding):
-            return any(c == code for c in self)
+            code_index = self.code_index
+            if self._system is not None and code.system != self._system:
+                return False
+            return code._key() in code_index
         else:
             return False
 
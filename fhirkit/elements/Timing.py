@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, Sequence, Union
+from typing import List, Optional, Union
 
 from pydantic import Field, PositiveInt, validator
 from fhirkit.elements import (
@@ -22,6 +22,8 @@ class TimingRepeat(Element):
 
     @validator("bounds", pre=True, always=True, allow_reuse=True)
     def validate_bounds(cls, value, values, field):
+        if isinstance(value, (Duration, Range, Period)):
+            return value
         return deterimine_choice_type(cls, value, values, field)
 
     count: Optional[PositiveInt] = None
@@ -34,18 +36,12 @@ class TimingRepeat(Element):
     period: Optional[decimal] = None
     periodMax: Optional[decimal] = None
     periodUnit: Optional[Code] = None
-    dayOfWeek: Sequence[Code] = []
-    timeOfDay: Sequence[Code] = []
-    when: Sequence[Code] = []
-
-
-TimingRepeat.update_forward_refs()
+    dayOfWeek: List[Code] = Field(default_factory=list)
+    timeOfDay: List[Code] = Field(default_factory=list)
+    when: List[Code] = Field(default_factory=list)
 
 
 class Timing(BackboneElement):
-    event: Sequence[datetime] = []
+    event: List[datetime] = Field(default_factory=list)
     repeat: Optional[TimingRepeat] = None
     code: Optional[CodeableConcept] = None
-
-
-Timing.update_forward_refs()
@@ -59,6 +59,9 @@ class AbstractCoding(Element):
     class Config:
         allow_mutation = False
 
+    def _key(self):
+        return (self.system, self.code)
+
 
 @total_ordering
 class Coding(AbstractCoding):
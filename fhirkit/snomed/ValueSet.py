@@ -37,7 +37,7 @@ class SCTECLFilter(VSFilter):
 
 
 class SCTImplicitCompose(VSCompose):
-    include: Tuple[SCTImplicitInclude]
+    include: Tuple[SCTImplicitInclude]  # type: ignore[assignment]
 
 
 class SCTImplicitValueSet(ValueSet):
@@ -123,7 +123,7 @@ class SCTImplicitInclude(VSInclude):
     system: URI = Field("http://snomed.info/sct")
     concept: List = Field([], const=True)
     valueSet: List = Field([], const=True)
-    filter: Tuple[Union[SCTDescendantsFilter, SCTECLFilter]]
+    filter: Tuple[Union[SCTDescendantsFilter, SCTECLFilter]]  # type: ignore[assignment]
 
     def equivalent_url(self):
         if self.version is not None:
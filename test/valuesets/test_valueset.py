@@ -1,5 +1,9 @@
+from datetime import datetime
+import pytest
 import pytest_check as check
-from fhirkit import ValueSet, SCTCoding, SimpleValueSet, CodeableConcept
+from pydantic import ValidationError
+from fhirkit import ValueSet, SCTCoding, SCTConcept, SimpleValueSet, CodeableConcept, Coding
+from fhirkit.ValueSet import VSCodingWithDesignation, VSExpansion, VSFilter
 
 
 def test_valueset_iterator():
@@ -75,3 +79,146 @@ def test_simple_valuesets_contains_2():
     )
 
     assert cc in vs
+
+
+def test_valueset_filter_op():
+    vs_filter = VSFilter(property="concept", op="is-a", value="6142004")
+    assert vs_filter.op == "is-a"
+    with pytest.raises(ValidationError):
+        VSFilter(property="concept", op="is-an", value="6142004")
+
+
+def test_simple_valueset_append_updates_index():
+    vs = SimpleValueSet(
+        SCTCoding("6142004 |influenza (aandoening)|"),
+    )
+    assert vs.validate_code(SCTCoding("6142004 |influenza (aandoening)|"))
+    assert not vs.validate_code(SCTCoding("24662006 |influenza B (aandoening)|"))
+    vs.append(VSCodingWithDesignation(system="http://snomed.info/sct", code="24662006"))
+    assert vs.validate_code(SCTCoding("24662006 |influenza B (aandoening)|"))
+
+
+def test_simple_valueset_extend_with_dicts():
+    vs = SimpleValueSet(
+        SCTCoding("6142004 |influenza (aandoening)|"),
+    )
+    vs.extend(
+        [
+            {"system": "http://snomed.info/sct", "code": "442438000"},
+            {"system": "http://snomed.info/sct", "code": "24662006"},
+        ]
+    )
+    assert len(vs) == 3
+    assert all(isinstance(c, VSCodingWithDesignation) for c in vs)
+    assert vs.validate_code(SCTCoding("24662006 |influenza B (aandoening)|"))
+
+
+def test_simple_valueset_other_system():
+    vs = SimpleValueSet(
+        SCTCoding("6142004 |influenza (aandoening)|"),
+    )
+    assert not vs.validate_code(Coding(system="http://loinc.org", code="6142004"))
+    vs.append(VSCodingWithDesignation(system="http://loinc.org", code="6142004"))
+    assert vs.validate_code(Coding(system="http://loinc.org", code="6142004"))
+
+
+def test_simple_valueset_index_after_init_expansion():
+    vs = SimpleValueSet(
+        SCTCoding("6142004 |influenza (aandoening)|"),
+    )
+    assert SCTCoding("6142004 |influenza (aandoening)|") in vs
+    vs.init_expansion()
+    assert len(vs) == 0
+    assert SCTCoding("6142004 |influenza (aandoening)|") not in vs
+
+
+def test_simple_valueset_index_after_expansion_reassignment():
+    vs = SimpleValueSet(
+        SCTCoding("6142004 |influenza (aandoening)|"),
+    )
+    assert SCTCoding("6142004 |influenza (aandoening)|") in vs
+    vs.expansion = VSExpansion(
+        contains=[VSCodingWithDesignation(system="http://snomed.info/sct", code="24662006")]
+    )
+    assert SCTCoding("6142004 |influenza (aandoening)|") not in vs
+    assert SCTCoding("24662006 |influenza B (aandoening)|") in vs
+
+
+def test_simple_valueset_index_after_copy_with_expansion():
+    vs = SimpleValueSet(
+        SCTCoding("6142004 |influenza (aandoening)|"),
+    )
+    assert SCTCoding("6142004 |influenza (aandoening)|") in vs
+    vs_copy = vs.copy(
+        update={
+            "expansion": VSExpansion(
+                contains=[VSCodingWithDesignation(system="http://snomed.info/sct", code="24662006")]
+            )
+        }
+    )
+    assert SCTCoding("6142004 |influenza (aandoening)|") not in vs_copy
+    assert SCTCoding("24662006 |influenza B (aandoening)|") in vs_copy
+    assert SCTCoding("6142004 |influenza (aandoening)|") in vs
+
+
+def test_expansion_timestamp_is_lazy():
+    expansion = VSExpansion()
+    assert expansion.timestamp is None
+    assert isinstance(expansion.timestamp_or_now, datetime)
+    expansion.json()
+    expansion.copy()
+    assert expansion == VSExpansion()
+    assert expansion.timestamp is None
+
+
+def test_expansion_explicit_timestamp_is_kept():
+    timestamp = datetime(2021, 12, 13, 20, 43, 16)
+    expansion = VSExpansion(timestamp=timestamp)
+    expansion.json()
+    assert expansion.timestamp == timestamp
+    assert expansion.timestamp_or_now == timestamp
+
+
+def test_simple_valueset_system_after_expansion_reassignment():
+    vs = SimpleValueSet(
+        SCTCoding("6142004 |influenza (aandoening)|"),
+    )
+    assert not vs.validate_code(Coding(system="http://loinc.org", code="6142004"))
+    vs.expansion = VSExpansion(
+        contains=[VSCodingWithDesignation(system="http://loinc.org", code="6142004")]
+    )
+    assert vs.validate_code(Coding(system="http://loinc.org", code="6142004"))
+    assert not vs.validate_code(SCTCoding("6142004 |influenza (aandoening)|"))
+
+
+def test_valueset_contains_item_types():
+    vs = SimpleValueSet(
+        SCTCoding("6142004 |influenza (aandoening)|"),
+    )
+    assert SCTCoding("6142004 |influenza (aandoening)|") in vs
+    assert SCTCoding("24662006 |influenza B (aandoening)|") not in vs
+    assert Coding(system="http://snomed.info/sct", code="6142004") in vs
+    assert Coding(system="http://snomed.info/sct", code="24662006") not in vs
+    assert SCTConcept("6142004 |influenza (aandoening)|") in vs
+    assert CodeableConcept(coding=[Coding(system="http://snomed.info/sct", code="6142004")]) in vs
+    assert CodeableConcept(coding=[Coding(system="http://snomed.info/sct", code="24662006")]) not in vs
+    assert "6142004" not in vs
+    assert None not in vs
+
+
+def test_valueset_truthiness_does_not_expand():
+    vs = ValueSet(status="active")
+    assert vs
+    assert vs.expansion is None
+    assert SimpleValueSet(expansion=VSExpansion())
+
+
+def test_simple_valueset_invalidate_index_after_in_place_edit():
+    vs = SimpleValueSet(
+        SCTCoding("6142004 |influenza (aandoening)|"),
+    )
+    assert SCTCoding("6142004 |influenza (aandoening)|") in vs
+    vs.expansion.contains[0] = VSCodingWithDesignation(system="http://snomed.info/sct", code="24662006")
+    vs.invalidate_index()
+    assert SCTCoding("6142004 |influenza (aandoening)|") not in vs
+    assert SCTCoding("24662006 |influenza B (aandoening)|") in vs